@@ -1,68 +1,376 @@
-from pymongo import MongoClient, errors
-from bson.objectid import ObjectId 
-
-class Animal_Shelter(object): 
-    """ CRUD operations for Animal collection in MongoDB """ 
-
-    def __init__(self, user, password, host, port, database, collection): 
-        # Initializing the MongoClient. This helps to access the MongoDB 
-        # databases and collections. This is hard-wired to use the aac 
-        # database, the animals collection, and the aac user. 
-        # 
-        # You must edit the password below for your environment. 
-        # 
-        # Connection Variables 
-        # 
+import functools
+import json
+import time
+
+import pandas as pd
+from pymongo import MongoClient, errors, ASCENDING, DESCENDING, ReturnDocument, UpdateMany
+from pymongo.read_preferences import ReadPreference
+from bson.objectid import ObjectId
+
+
+# Normalize a sort spec once and cache the result. The dashboard re-issues the
+# same handful of sort specs on every callback, so the per-call tuple building
+# and direction comparisons collapse into a single cached dict lookup.
+@functools.lru_cache(maxsize=256)
+def _norm_sort(spec):
+    return tuple((field, ASCENDING if direction >= 0 else DESCENDING)
+                 for field, direction in spec)
+
+class Animal_Shelter(object):
+    """ CRUD operations for Animal collection in MongoDB """
+
+    # Fields backed by an index (see ensure_indexes). Filters on anything else
+    # would silently fall back to a full collection scan, so the read paths
+    # reject them up front instead of letting latency grow with the collection.
+    INDEXED_FIELDS = {"_id", "animal_type", "sex_upon_outcome",
+                      "age_upon_outcome_in_weeks", "breed", "rec_num", "location",
+                      "age_bucket"}
+
+    # One shared MongoClient per connection URI. Each MongoClient owns its own
+    # connection pool and monitor threads, so every Animal_Shelter instance
+    # reuses the pool instead of opening fresh TCP connections.
+    _clients = {}
+
+    def __init__(self, user, password, host, port, database, collection, **kwargs):
+        # Initializing the MongoClient. This helps to access the MongoDB
+        # databases and collections. This is hard-wired to use the aac
+        # database, the animals collection, and the aac user.
+        #
+        # You must edit the password below for your environment.
+        #
+        # Connection Variables
+        #
         USER = user
         PASS = password
-        HOST = host 
-        PORT = port 
-        DB = database 
-        COL = collection 
-        # 
-        # Initialize Connection 
-        # 
-        self.client = MongoClient(f"mongodb://{USER}:{PASS}@{HOST}:{PORT}/{DB}?authSource={DB}")
-        self.database = self.client['%s' % (DB)] 
-        self.collection = self.database['%s' % (COL)] 
+        HOST = host
+        PORT = port
+        DB = database
+        COL = collection
+        #
+        # Initialize Connection
+        #
+        uri = f"mongodb://{USER}:{PASS}@{HOST}:{PORT}/{DB}?authSource={DB}"
+
+        # Reuse an existing client for this URI if one was already built; the
+        # Dash callbacks may construct several shelters against the same server
+        if uri not in Animal_Shelter._clients:
+            Animal_Shelter._clients[uri] = MongoClient(
+                uri,
+                maxPoolSize=kwargs.get("maxPoolSize", 50),
+                minPoolSize=kwargs.get("minPoolSize", 5),
+                serverSelectionTimeoutMS=kwargs.get("serverSelectionTimeoutMS", 3000),
+                socketTimeoutMS=kwargs.get("socketTimeoutMS", None),
+                w=kwargs.get("w", 1))
+
+        self.client = Animal_Shelter._clients[uri]
+        self.database = self.client[DB]
+        self.collection = self.database[COL]
+
+        # Cache the handles the write hot path uses. Database attribute access
+        # (self.database.animals) builds a brand new Collection object on every
+        # call, so resolving them once here avoids that per-insert allocation.
+        self._animals = self.database["animals"]
+        self._counters = self.database["counters"]
+
+        # Analytics reads (counts, breed aggregations) do not need the primary;
+        # letting them fall to a secondary keeps the primary's cache and CPU
+        # free for the write path when running against a replica set
+        self.analytics = self.collection.with_options(
+            read_preference=kwargs.get("read_preference", ReadPreference.SECONDARY_PREFERRED))
+
+        # Small in-process cache for breed_counts results. The dashboard
+        # re-runs the same handful of filters constantly, so repeat hits skip
+        # the aggregation round-trip entirely. The generation counter is mixed
+        # into every key and bumped on any write, which invalidates the whole
+        # cache without having to track which queries a write affected.
+        self._bc_cache = {}
+        self._bc_cache_ttl = 30 # Seconds a cached result stays fresh
+        self._cache_gen = 0
             
+    # Create a method to build the indexes the dashboard queries rely on
+    def ensure_indexes(self):
+        # The rescue filters always supply animal_type and sex_upon_outcome as
+        # equalities, breed as an $in list, and age_upon_outcome_in_weeks as a
+        # range. Following the ESR rule (equality, sort, range) the range field
+        # must come last so MongoDB can use every earlier field in the B-tree.
+        try:
+            # Drop any previous version of the index so the key order below is
+            # the one that actually exists. Safe to repeat on every startup.
+            self.collection.drop_index("idx_rescue_filters")
+
+        except errors.OperationFailure:
+            # The index did not exist yet, which is fine on a fresh database
+            pass
+
+        # Compound index ordered equality -> equality -> $in -> range
+        self.collection.create_index(
+            [("animal_type", ASCENDING),
+             ("sex_upon_outcome", ASCENDING),
+             ("breed", ASCENDING),
+             ("age_upon_outcome_in_weeks", ASCENDING)],
+            name="idx_rescue_filters")
+
+        # Descending index on rec_num so a max-record lookup is a single
+        # index seek instead of a full collection scan
+        self.collection.create_index([("rec_num", DESCENDING)], name="idx_rec_num")
+
+        # 2dsphere index on the GeoJSON location field so $near / $geoWithin
+        # map queries are index seeks; a plain (lat, long) compound index
+        # cannot serve radius queries at all
+        self.collection.create_index([("location", "2dsphere")], name="idx_location_2dsphere")
+
+        # Index on the precomputed age bucket so histogram queries are
+        # equality scans instead of open-ended ranges over age-in-weeks
+        self.collection.create_index([("age_bucket", ASCENDING)], name="idx_age_bucket")
+
+    # Create a method to backfill the GeoJSON location field from lat/long columns
+    def backfill_locations(self):
+        # The AAC export stores location_lat / location_long as plain numbers.
+        # Copy them into a GeoJSON Point (note: coordinates are [long, lat])
+        # so the 2dsphere index can serve real geo queries.
+        try:
+            result = self.collection.update_many(
+                {"location": {"$exists": False},
+                 "location_lat": {"$type": "number"},
+                 "location_long": {"$type": "number"}},
+                [{"$set": {"location": {
+                    "type": "Point",
+                    "coordinates": ["$location_long", "$location_lat"]}}}])
+
+            # Return the count of documents that gained a location field
+            return result.modified_count
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the backfill
+            print(f"An error occurred while backfilling locations: {e}")
+            return 0 # Return 0 documents modified if an error occurs
+
+    # Create a method to backfill the precomputed age bucket for histograms
+    def backfill_age_bucket(self):
+        # Age histograms keep re-running range filters over
+        # age_upon_outcome_in_weeks. Storing the 4-week bucket on each
+        # document turns those ranges into indexed equality lookups.
+        try:
+            result = self.collection.update_many(
+                {"age_upon_outcome_in_weeks": {"$type": "number"}},
+                [{"$set": {"age_bucket": {
+                    "$toInt": {"$divide": ["$age_upon_outcome_in_weeks", 4]}}}}])
+
+            # Return the count of documents that gained an age_bucket field
+            return result.modified_count
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the backfill
+            print(f"An error occurred while backfilling age buckets: {e}")
+            return 0 # Return 0 documents modified if an error occurs
+
+    # Create a method to count animals per 4-week age bucket for histograms
+    def age_bucket_counts(self, buckets=None):
+        try:
+            # Equality $in on the indexed bucket field replaces a range scan
+            # over age_upon_outcome_in_weeks; with no buckets given, count all
+            pipeline = []
+            if buckets is not None:
+                pipeline.append({"$match": {"age_bucket": {"$in": list(buckets)}}})
+
+            pipeline += [
+                {"$project": {"_id": 0, "age_bucket": 1}},
+                {"$group": {"_id": "$age_bucket", "count": {"$sum": 1}}},
+                {"$sort": {"_id": 1}}
+            ]
+
+            results = list(self.analytics.aggregate(pipeline))
+            return results # Return list of {_id: bucket, count: n} documents
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the aggregation
+            print(f"An error occurred while counting the age buckets: {e}")
+            return [] # Return an empty list if the aggregation fails
+
+    # Create a method to find animals near a point on the map
+    def near(self, lng, lat, max_meters):
+        try:
+            # $near walks the 2dsphere index outward from the point, so the
+            # cost scales with the number of nearby animals, not the collection
+            query = {"location": {"$near": {
+                "$geometry": {"type": "Point", "coordinates": [lng, lat]},
+                "$maxDistance": max_meters}}}
+
+            return list(self.collection.find(query))
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the query
+            print(f"An error occurred while running the geo query: {e}")
+            return [] # Return an empty list if the read fails
+
     # Create a method to return the next available record number for use in the create method
     def getNextRecordNum(self):
-        # Query the animals collection for the document with the highest rec_num value
-        out = self.database.animals.find().sort([('rec_num', -1)]).limit(1)
-        
-        # Loop through the result and return the next record number
-        for dict in out:
-            return (dict['rec_num'] + 1)
-        
-    # Create method to implement the C in CRUD. 
-    def create(self, data):
-        # Check that some data was provided
-        if data is not None:
+        # Atomically increment a counter document instead of sorting the whole
+        # animals collection for the highest rec_num. This is a single indexed
+        # _id lookup plus an in-place $inc, so it stays O(1) no matter how many
+        # animals exist, and two concurrent callers can never get the same number.
+        doc = self._counters.find_one_and_update(
+            {"_id": "animals_rec_num"},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER)
+
+        # The counter starts at 1 on an empty database instead of returning None
+        return doc["seq"]
+
+    # Create method to insert many documents at once for bulk/seed loading
+    def create_many(self, docs):
+        # Check that a non-empty list of documents was provided
+        if docs:
             try:
-                # Insert the provided dictionary as a new document into the animals collection
-                self.database.animals.insert_one(data)  # data should be dictionary
-                return True # Indicate that the insert succeeded
-            
+                # Insert the whole batch in one wire message. ordered=False lets
+                # the server keep going past individual bad documents and lets
+                # it group-commit the batch instead of one round-trip per doc.
+                result = self._animals.insert_many(docs, ordered=False)
+
+                # Any write invalidates cached analytics results
+                self._cache_gen += 1
+                return len(result.inserted_ids) # Number of documents inserted
+
+            except errors.BulkWriteError as e:
+                # Some documents failed; report the errors and return how many made it in
+                print(f"An error occurred while bulk inserting the data: {e.details}")
+                return e.details.get('nInserted', 0)
+
             except errors.PyMongoError as e:
-                # Catch and display any database related errors during insert
+                # Catch and display any other database related errors during insert
                 print(f"An error occurred while inserting the data: {e}")
-                return False # Indicate that the insert failed
-            
-        else: 
+                return 0 # Indicate that nothing was inserted
+
+        else:
+            # If no documents are given, raise an exception rather than inserting nothing
+            raise Exception("Nothing to save, because docs parameter is empty")
+
+    # Create method to implement the C in CRUD.
+    def create(self, data):
+        # Check that some data was provided
+        if data is not None:
+            # Assign the next record number atomically from the counter unless
+            # the caller already set one. Callers no longer need a separate
+            # getNextRecordNum round-trip, and two concurrent creates can never
+            # end up with the same rec_num.
+            data.setdefault("rec_num", self.getNextRecordNum())
+
+            # Reuse the bulk path with a single-document batch
+            return self.create_many([data]) == 1
+
+        else:
             # If no data is given, raise an exception rather than inserting nothing
-            raise Exception("Nothing to save, because data parameter is empty") 
+            raise Exception("Nothing to save, because data parameter is empty")
+
+    # Create a helper to collect plan stage names from an explain tree
+    def _plan_stages(self, stage):
+        # Walk the nested stage documents and gather every stage name
+        stages = []
+        if isinstance(stage, dict):
+            if "stage" in stage:
+                stages.append(stage["stage"])
+            if "inputStage" in stage:
+                stages += self._plan_stages(stage["inputStage"])
+            for sub_stage in stage.get("inputStages", []):
+                stages += self._plan_stages(sub_stage)
+        return stages
+
+    # Create a helper to warn when an explain plan looks like a regression
+    def _warn_bad_plan(self, explain_doc, query):
+        # Pull the winning plan and (when present) its execution statistics
+        stats = explain_doc.get("executionStats", {})
+        winning = explain_doc.get("queryPlanner", {}).get("winningPlan", {})
+        stages = self._plan_stages(stats.get("executionStages") or winning)
+
+        # A COLLSCAN stage means the query is not using any index at all
+        if "COLLSCAN" in stages:
+            print(f"Plan warning: COLLSCAN (no index used) for query: {query}")
+
+        # A high examined-to-returned ratio means the index is a poor fit
+        examined = stats.get("totalDocsExamined", 0)
+        returned = stats.get("nReturned", 0)
+        if examined / max(returned, 1) > 10:
+            print(f"Plan warning: examined {examined} docs to return "
+                  f"{returned} for query: {query}")
+
+    # Create a helper to reject filters that cannot be served by an index
+    def _validate_query(self, query):
+        # Every top-level field must be indexed; logical operators are fine as
+        # long as all of their child filters validate too
+        for key, value in query.items():
+            if key in ("$and", "$or", "$nor"):
+                for sub_query in value:
+                    self._validate_query(sub_query)
+
+            elif key not in self.INDEXED_FIELDS:
+                # Refuse the query rather than hand MongoDB a collection scan
+                raise Exception(f"Query field '{key}' is not indexed; "
+                                f"allowed fields are: {sorted(self.INDEXED_FIELDS)}")
+
+    # Create a generator helper so large result sets stream in fixed chunks
+    def _stream_read(self, query, limit, sort=None):
+        # Apply the sort and limit before iterating if requested
+        cursor = self.collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        # Pull documents from the server 1000 at a time instead of letting the
+        # driver step up to 16MB batches, keeping memory use predictable
+        yield from cursor.batch_size(1000)
 
     # Create method to implement the R in CRUD.
-    def read(self, query):
+    def read(self, query, limit=0, stream=False, after=None, sort=None, explain=False):
         # Ensure a query filter was provided
         if query is not None:
+            # Refuse filters that would force a collection scan
+            self._validate_query(query)
+
+            # Debug mode: run the query under explain first and warn if the
+            # planner picked a collection scan or a poorly-fitting index
+            if explain:
+                try:
+                    self._warn_bad_plan(
+                        self.collection.find(query).explain(), query)
+                except errors.PyMongoError as e:
+                    print(f"An error occurred while explaining the query: {e}")
+
+            # Normalize any caller-supplied (field, direction) pairs through
+            # the cached helper so repeat sort specs cost a dict lookup
+            if sort:
+                sort = list(_norm_sort(tuple((f, d) for f, d in sort)))
+
+            # Keyset ("seek") pagination: instead of an O(N) skip, resume just
+            # past the last rec_num the caller saw. The B-tree seeks straight
+            # to the boundary key, so every page costs the same regardless of
+            # how deep into the results it is.
+            if after is not None:
+                query = {"rec_num": {"$gt": after["rec_num"]}, **query}
+                sort = [("rec_num", ASCENDING)]
+
+            # Streaming callers get a generator so only one batch of documents
+            # lives in Python memory at a time
+            if stream:
+                return self._stream_read(query, limit, sort)
+
             try:
                 # Find all documents that match the query filter
+                cursor = self.collection.find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                if limit:
+                    cursor = cursor.limit(limit)
+
+                # Cap the batch size so an unfiltered read does not make the
+                # driver request giant batches while we build the list
+                cursor = cursor.batch_size(min(limit or 1000, 1000))
+
                 # Convert the cursor to a list so it can be returned directly
-                documents = list(self.collection.find(query))
+                documents = list(cursor)
                 return documents # Return matching documents as a list
-            
+
             except errors.PyMongoError as e:
                 # Catch and display any database related errors during the query
                 print(f"An error occurred while reading the data: {e}")
@@ -71,6 +379,156 @@ class Animal_Shelter(object):
             # If no query is given, raise an exception
             raise Exception("Query parameter is empty")
             
+    # Create a method to read matching documents straight into a DataFrame
+    def read_df(self, query, columns, limit=0, sort=None):
+        # Ensure a query filter and column list were provided
+        if query is not None and columns:
+            # Refuse filters that would force a collection scan
+            self._validate_query(query)
+
+            try:
+                # Project only the requested columns and drop _id so the
+                # DataFrame never sees ObjectId values (which crash dash_table)
+                projection = {c: 1 for c in columns}
+                projection["_id"] = 0
+
+                cursor = self.collection.find(query, projection)
+                if sort:
+                    cursor = cursor.sort(list(_norm_sort(tuple((f, d) for f, d in sort))))
+                if limit:
+                    cursor = cursor.limit(limit)
+
+                # Build the DataFrame directly from the cursor iterator so the
+                # documents are never collected into an intermediate list of
+                # dicts first - one pass, roughly half the peak memory
+                return pd.DataFrame.from_records(cursor.batch_size(1000), columns=columns)
+
+            except errors.PyMongoError as e:
+                # Catch and display any database related errors during the query
+                print(f"An error occurred while reading the data: {e}")
+                return pd.DataFrame(columns=columns) # Empty frame if the read fails
+
+        else:
+            # If no query or columns are given, raise an exception
+            raise Exception("Required parameters for read_df are missing: query and/or columns")
+
+    # Create a method to run the dashboard rescue filters in their canonical shape
+    def rescue(self, animal_type, sex, breeds, age_min, age_max, projection=None):
+        # Build the filter in equality -> $in -> range order so it lines up
+        # with the idx_rescue_filters key order exactly
+        query = {
+            "animal_type": animal_type,
+            "sex_upon_outcome": sex,
+            "breed": {"$in": list(breeds)},
+            "age_upon_outcome_in_weeks": {"$gte": age_min, "$lte": age_max}
+        }
+
+        # Default projection keeps just the fields the table and map need;
+        # excluding _id also keeps the query eligible for a covered index scan
+        if projection is None:
+            projection = {"_id": 0, "breed": 1, "animal_type": 1,
+                          "sex_upon_outcome": 1, "age_upon_outcome_in_weeks": 1,
+                          "location_lat": 1, "location_long": 1}
+
+        try:
+            # Hint the compound index so the planner never falls back to a
+            # collection scan for the map view
+            cursor = self.collection.find(query, projection).hint("idx_rescue_filters")
+            return list(cursor) # Return matching documents as a list
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the query
+            print(f"An error occurred while running the rescue filter: {e}")
+            return [] # Return an empty list if the read fails
+
+    # Create a method to count animals per breed for the dashboard pie chart
+    def breed_counts(self, query, limit=10, explain=False):
+        # Ensure a query filter was provided
+        if query is not None:
+            # Refuse filters that would force a collection scan
+            self._validate_query(query)
+
+            # Debug mode: explain the equivalent find to check that the
+            # $match stage will ride idx_rescue_filters and not a COLLSCAN
+            if explain:
+                try:
+                    self._warn_bad_plan(
+                        self.collection.find(query).explain(), query)
+                except errors.PyMongoError as e:
+                    print(f"An error occurred while explaining the query: {e}")
+
+            # Clamp the limit so a loose query can never ask the $group stage
+            # to hold an unbounded number of groups in memory
+            limit = max(1, min(int(limit), 500))
+
+            # Canonicalize the query so logically-identical filters share one
+            # cache entry regardless of key order
+            key = (json.dumps(query, sort_keys=True, default=str), limit, self._cache_gen)
+
+            # Serve a cached result if it exists and has not expired yet
+            cached = self._bc_cache.get(key)
+            if cached is not None and (time.time() - cached[0]) < self._bc_cache_ttl:
+                return cached[1]
+
+            try:
+                # $group cannot use an index by itself, so project the matched
+                # documents down to just the breed field first. With the
+                # idx_rescue_filters hint the whole pipeline can be answered
+                # from index keys without fetching full documents.
+                pipeline = [
+                    {"$match": query},
+                    {"$project": {"_id": 0, "breed": 1}},
+                    {"$group": {"_id": "$breed", "count": {"$sum": 1}}},
+                    {"$sort": {"count": -1}},
+                    {"$limit": limit}
+                ]
+
+                # Run the aggregation against the rescue-filter compound index.
+                # allowDiskUse=False plus the time budget makes a runaway query
+                # fail fast instead of spilling to disk and thrashing the
+                # server's cache for everyone else.
+                results = list(self.analytics.aggregate(
+                    pipeline, allowDiskUse=False, maxTimeMS=5000,
+                    hint="idx_rescue_filters"))
+
+                # Cache the result; reset the cache if it has grown too large
+                if len(self._bc_cache) > 512:
+                    self._bc_cache.clear()
+                self._bc_cache[key] = (time.time(), results)
+
+                return results # Return list of {_id: breed, count: n} documents
+
+            except errors.ExecutionTimeout:
+                # The aggregation blew its time budget; fail fast and empty
+                print(f"Breed count aggregation timed out for query: {query}")
+                return [] # Return an empty list rather than thrash the server
+
+            except errors.PyMongoError as e:
+                # Catch and display any database related errors during the aggregation
+                print(f"An error occurred while counting the breeds: {e}")
+                return [] # Return an empty list if the aggregation fails
+
+        else:
+            # If no query is given, raise an exception
+            raise Exception("Query parameter is empty")
+
+    # Create a method to count documents matching a query filter
+    def count(self, query=None):
+        try:
+            # The unfiltered total (used for pagination) can come straight
+            # from collection metadata instead of scanning the _id index
+            if not query:
+                return int(self.analytics.estimated_document_count())
+
+            # Refuse filters that would force a collection scan, then count
+            self._validate_query(query)
+            return int(self.analytics.count_documents(query))
+
+        except errors.PyMongoError as e:
+            # Catch and display any database related errors during the count
+            print(f"An error occurred while counting the data: {e}")
+            return 0 # Return 0 if the count fails
+
 # Method to implement the U in CRUD.
     def update(self, lookup_pair, update_data):
         # Ensure both lookup filter and update data are provided
@@ -85,7 +543,10 @@ class Animal_Shelter(object):
 
                 # Use update_many to allow for modification of multiple documents
                 result = self.collection.update_many(lookup_pair, update_operation)
-                
+
+                # Any write invalidates cached analytics results
+                self._cache_gen += 1
+
                 # Return the count of documents modified
                 return result.modified_count
             
@@ -98,6 +559,41 @@ class Animal_Shelter(object):
             # Raise an exception if required parameters are missing
             raise Exception("Required parameters for update are missing: lookup_pair and/or update_data")
 
+    # Create a method to apply many update pairs in a single round-trip
+    def bulk_update(self, pairs):
+        # Ensure a non-empty list of (lookup_pair, update_data) tuples was provided
+        if pairs:
+            try:
+                # Pack every update into one bulk_write message instead of one
+                # update_many round-trip per pair; ordered=False lets the
+                # server apply them without stopping at the first failure
+                ops = []
+                for lookup_pair, update_data in pairs:
+                    # Same operator check as update(): bare field dicts become $set
+                    if not any(key.startswith('$') for key in update_data.keys()):
+                        update_operation = {'$set': update_data}
+                    else:
+                        update_operation = update_data
+
+                    ops.append(UpdateMany(lookup_pair, update_operation))
+
+                result = self.collection.bulk_write(ops, ordered=False)
+
+                # Any write invalidates cached analytics results
+                self._cache_gen += 1
+
+                # Return the count of documents modified across the whole batch
+                return result.modified_count
+
+            except errors.PyMongoError as e:
+                # Catch and display any database related errors during the bulk update
+                print(f"An error occurred while bulk updating the data: {e}")
+                return 0 # Return 0 objects modified if an error occurs
+
+        else:
+            # Raise an exception if the required parameter is missing
+            raise Exception("Required parameter for bulk_update is missing: pairs")
+
     # Method to implement the D in CRUD.
     def delete(self, lookup_pair):
         # Ensure a lookup filter was provided
@@ -105,7 +601,10 @@ class Animal_Shelter(object):
             try:
                 # Use delete_many to allow for removal of multiple documents
                 result = self.collection.delete_many(lookup_pair)
-                
+
+                # Any write invalidates cached analytics results
+                self._cache_gen += 1
+
                 # Return the count of documents removed
                 return result.deleted_count
             